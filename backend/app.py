@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import logging
+import os
+from collections.abc import Callable
 from pathlib import Path
+from typing import Any, TypeVar, cast
 
 import uvicorn
 from fastapi import FastAPI, HTTPException
@@ -11,6 +14,7 @@ from pydantic import BaseModel
 
 try:
     from .engine import (
+        AnalysisColumns,
         AnalysisEngine,
         CompleteAnalysisResult,
         CounterAnalysisResult,
@@ -18,6 +22,7 @@ try:
     )
 except ImportError:
     from engine import (
+        AnalysisColumns,
         AnalysisEngine,
         CompleteAnalysisResult,
         CounterAnalysisResult,
@@ -70,6 +75,10 @@ class AnalyzeCompleteResponse(BaseModel):
 
 
 ENGINES: dict[str, AnalysisEngine] = {}
+RESULTS: dict[tuple[Any, ...], AnalysisColumns] = {}
+RESULT_CACHE_BYTES = int(os.environ.get("WAVEGAUGE_RESULT_CACHE_BYTES", 512 * 1024 * 1024))
+
+ResultT = TypeVar("ResultT", bound=AnalysisColumns)
 
 
 def get_engine(file_path: str, max_cache_num: int = 16) -> AnalysisEngine:
@@ -85,6 +94,23 @@ def get_engine(file_path: str, max_cache_num: int = 16) -> AnalysisEngine:
     return engine
 
 
+def get_result(
+    key: tuple[Any, ...], compute: Callable[[], ResultT], max_cache_bytes: int = RESULT_CACHE_BYTES
+) -> ResultT:
+    # 命中时重新插入到末尾, 按最近使用顺序淘汰
+    result = RESULTS.pop(key, None)
+    if result is None:
+        result = compute()
+        if result.nbytes > max_cache_bytes:
+            return cast(ResultT, result)
+
+        cached_bytes = sum(cached.nbytes for cached in RESULTS.values())
+        while RESULTS and cached_bytes + result.nbytes > max_cache_bytes:
+            cached_bytes -= RESULTS.pop(next(iter(RESULTS))).nbytes
+    RESULTS[key] = result
+    return cast(ResultT, result)
+
+
 def resolve_frontend_path(request_path: str) -> Path | None:
     if not frontend_dist.is_dir():
         return None
@@ -118,9 +144,12 @@ def format_exception_detail(error: Exception) -> str:
 async def analyze_instant(req: AnalyzeInstantRequest) -> AnalyzeInstantResponse:
     try:
         engine = get_engine(req.file_path)
-        table_data = engine.analyze_instant(req.transform_code)
+        table_data = get_result(
+            ("instant", req.file_path, req.transform_code),
+            lambda: engine.analyze_instant(req.transform_code),
+        )
 
-        return AnalyzeInstantResponse(status="success", data=table_data)
+        return AnalyzeInstantResponse(status="success", data=table_data.to_dict())
 
     except Exception as e:
         logging.exception("Analyze instant request failed")
@@ -132,9 +161,12 @@ async def analyze_counter(req: AnalyzeCounterRequest) -> AnalyzeCounterResponse:
     try:
         print(req)
         engine = get_engine(req.file_path)
-        table_data = engine.analyze_counter(req.transform_code, req.sample_rate)
+        table_data = get_result(
+            ("counter", req.file_path, req.transform_code, req.sample_rate),
+            lambda: engine.analyze_counter(req.transform_code, req.sample_rate),
+        )
 
-        return AnalyzeCounterResponse(status="success", data=table_data)
+        return AnalyzeCounterResponse(status="success", data=table_data.to_dict())
 
     except Exception as e:
         logging.exception("Analyze counter request failed")
@@ -145,9 +177,12 @@ async def analyze_counter(req: AnalyzeCounterRequest) -> AnalyzeCounterResponse:
 async def analyze_complete(req: AnalyzeCompleteRequest) -> AnalyzeCompleteResponse:
     try:
         engine = get_engine(req.file_path)
-        table_data = engine.analyze_complete(req.transform_code)
+        table_data = get_result(
+            ("complete", req.file_path, req.transform_code),
+            lambda: engine.analyze_complete(req.transform_code),
+        )
 
-        return AnalyzeCompleteResponse(status="success", data=table_data)
+        return AnalyzeCompleteResponse(status="success", data=table_data.to_dict())
 
     except Exception as e:
         logging.exception("Analyze complete request failed")
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
 from pathlib import Path
+import os
 import sys
 import traceback
 import functools
 import types
+from collections.abc import Mapping
 from typing import Any, cast
 
 import numpy as np
@@ -12,6 +18,7 @@ import pandas as pd
 from asteval import Interpreter
 from typing_extensions import TypedDict
 from wavekit import Waveform
+from wavekit.signal import Signal
 
 try:
     from wavekit import FsdbReader, VcdReader
@@ -128,6 +135,7 @@ class CounterAnalysisResult(TypedDict):
     series: dict[str, CounterSeries]
     time_range: list[float | int]
     is_multiseries: bool
+    memory_bytes: int
 
 
 class InstantSeries(TypedDict):
@@ -139,6 +147,7 @@ class InstantAnalysisResult(TypedDict):
     series: dict[str, InstantSeries]
     time_range: list[float | int]
     is_multiseries: bool
+    memory_bytes: int
 
 
 class CompleteSeries(TypedDict):
@@ -151,6 +160,292 @@ class CompleteAnalysisResult(TypedDict):
     series: dict[str, CompleteSeries]
     time_range: list[float | int]
     is_multiseries: bool
+    memory_bytes: int
+
+
+def narrow_dtype(array: np.ndarray) -> np.ndarray:
+    """Return *array* cast to the narrowest dtype of the same kind that holds it losslessly."""
+    if array.size == 0 or array.dtype.kind not in "iuf":
+        return array
+    if array.dtype.kind == "f":
+        for dtype in (np.float16, np.float32):
+            # 超出范围的值会变成 inf, 随后的比较会拒绝该 dtype
+            with np.errstate(over="ignore"):
+                narrowed = array.astype(dtype)
+            if np.array_equal(narrowed, array, equal_nan=True):
+                return narrowed
+        return array
+    candidates: tuple[type[np.integer[Any]], ...] = (
+        (np.int8, np.int16, np.int32, np.int64)
+        if array.dtype.kind == "i"
+        else (np.uint8, np.uint16, np.uint32, np.uint64)
+    )
+    low, high = array.min(), array.max()
+    for int_dtype in candidates:
+        info = np.iinfo(int_dtype)
+        if info.min <= low and high <= info.max:
+            return array.astype(int_dtype)
+    return array
+
+
+def column_nbytes(array: np.ndarray) -> int:
+    """Return the memory held by *array*, including the Python objects of object arrays."""
+    nbytes = int(array.nbytes)
+    if array.dtype == np.object_:
+        nbytes += sum(sys.getsizeof(item) for item in array.flat)
+    return nbytes
+
+
+class TimeColumn:
+    """Timestamps stored as an int64 start plus narrowed deltas.
+
+    Uniformly sampled timestamps collapse to a single step, so a counter with
+    a fixed sample period costs a few bytes regardless of its length. Times
+    that are not integral (e.g. downsampled means) are kept as a float64 array.
+    """
+
+    def __init__(self, time: np.ndarray) -> None:
+        time = np.asarray(time)
+        self.count = len(time)
+        self.start = 0
+        self.step: int | None = None
+        self.deltas: np.ndarray | None = None
+        self.raw: np.ndarray | None = None
+
+        if time.dtype.kind == "f" and not np.array_equal(time, np.round(time)):
+            self.raw = time.astype(np.float64)
+            return
+        time = time.astype(np.int64)
+        if self.count == 0:
+            return
+        self.start = int(time[0])
+        deltas = np.diff(time)
+        if deltas.size == 0 or np.all(deltas == deltas[0]):
+            self.step = int(deltas[0]) if deltas.size else 0
+        else:
+            self.deltas = narrow_dtype(deltas)
+
+    @property
+    def nbytes(self) -> int:
+        if self.raw is not None:
+            return int(self.raw.nbytes)
+        if self.deltas is not None:
+            return int(self.deltas.nbytes) + 8
+        return 16
+
+    def to_numpy(self) -> np.ndarray:
+        if self.raw is not None:
+            return self.raw
+        if self.deltas is not None:
+            time = np.empty(self.count, dtype=np.int64)
+            time[0] = self.start
+            np.cumsum(self.deltas, dtype=np.int64, out=time[1:])
+            time[1:] += self.start
+            return time
+        return self.start + np.arange(self.count, dtype=np.int64) * (self.step or 0)
+
+
+class SeriesColumns:
+    """Columnar storage for one series of an analysis result."""
+
+    def __init__(
+        self,
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        durations: np.ndarray | None = None,
+    ) -> None:
+        self.timestamps = TimeColumn(timestamps)
+        self.values = narrow_dtype(np.asarray(values))
+        self.durations = narrow_dtype(np.asarray(durations)) if durations is not None else None
+
+    @property
+    def nbytes(self) -> int:
+        nbytes = self.timestamps.nbytes + column_nbytes(self.values)
+        if self.durations is not None:
+            nbytes += column_nbytes(self.durations)
+        return nbytes
+
+
+class AnalysisColumns:
+    """In-memory analysis result; converted to the JSON result dict only by ``to_dict``."""
+
+    def __init__(
+        self,
+        series: dict[str, SeriesColumns],
+        time_range: np.ndarray,
+        is_multiseries: bool,
+    ) -> None:
+        self.series = series
+        self.time_range = time_range
+        self.is_multiseries = is_multiseries
+
+    @functools.cached_property
+    def nbytes(self) -> int:
+        return sum(series.nbytes for series in self.series.values()) + int(self.time_range.nbytes)
+
+    def series_to_dict(self, key: str, columns: SeriesColumns) -> dict[str, list[Any]]:
+        return {
+            "timestamps": columns.timestamps.to_numpy().tolist(),
+            "values": columns.values.tolist(),
+        }
+
+    def to_dict(self) -> Mapping[str, Any]:
+        return {
+            "series": {
+                key: self.series_to_dict(key, columns) for key, columns in self.series.items()
+            },
+            "time_range": self.time_range.tolist(),
+            "is_multiseries": self.is_multiseries,
+            "memory_bytes": self.nbytes,
+        }
+
+
+class CounterColumns(AnalysisColumns):
+    def to_dict(self) -> CounterAnalysisResult:
+        return cast(CounterAnalysisResult, super().to_dict())
+
+
+class InstantColumns(AnalysisColumns):
+    def to_dict(self) -> InstantAnalysisResult:
+        return cast(InstantAnalysisResult, super().to_dict())
+
+
+class CompleteColumns(AnalysisColumns):
+    def series_to_dict(self, key: str, columns: SeriesColumns) -> dict[str, list[Any]]:
+        assert columns.durations is not None, f"Missing durations for key {key}"
+        series = super().series_to_dict(key, columns)
+        series["durations"] = columns.durations.tolist()
+        return series
+
+    def to_dict(self) -> CompleteAnalysisResult:
+        return cast(CompleteAnalysisResult, super().to_dict())
+
+
+# MW() 的并行加载进程数上限为 CPU 核数. 每个 worker 进程都会持有完整解析后的波形文件,
+# 因此内存占用最多约为 MAX_LOAD_WORKERS x MAX_WORKER_READERS 份解析结果
+MAX_LOAD_WORKERS = os.cpu_count() or 1
+LOAD_WORKERS = min(int(os.environ.get("WAVEGAUGE_LOAD_WORKERS", 1)), MAX_LOAD_WORKERS)
+MAX_WORKER_READERS = 4
+
+_LOAD_POOL: ProcessPoolExecutor | None = None
+
+# 每个 worker 进程内缓存已打开的 reader, 避免重复解析波形文件.
+# key 包含文件的 mtime, 文件被重写后不会再使用旧的解析结果
+_WORKER_READERS: dict[tuple[str, int], Any] = {}
+
+
+def get_load_pool() -> ProcessPoolExecutor:
+    """Return the process pool shared by all engines, sized to the CPU count.
+
+    Worker processes are only spawned on demand, so the pool grows up to the
+    largest chunk count requested so far and keeps the readers warmed in them.
+    """
+    global _LOAD_POOL
+    if _LOAD_POOL is None:
+        # spawn 避免在多线程的服务进程中 fork, 以及 FSDB 原生库状态被复制到子进程
+        _LOAD_POOL = ProcessPoolExecutor(
+            max_workers=MAX_LOAD_WORKERS, mp_context=get_context("spawn")
+        )
+    return _LOAD_POOL
+
+
+def reset_load_pool() -> None:
+    global _LOAD_POOL
+    if _LOAD_POOL is not None:
+        _LOAD_POOL.shutdown(wait=False)
+        _LOAD_POOL = None
+
+
+def _get_worker_reader(file_path: str, mtime_ns: int) -> Any:
+    reader = _WORKER_READERS.pop((file_path, mtime_ns), None)
+    if reader is None:
+        if len(_WORKER_READERS) >= MAX_WORKER_READERS:
+            earliest_key = next(iter(_WORKER_READERS))
+            _WORKER_READERS.pop(earliest_key).__exit__(None, None, None)
+        reader = AnalysisEngine.get_reader_class(file_path)(file_path)
+        reader.__enter__()
+    # 重新插入到末尾, 按最近使用顺序淘汰
+    _WORKER_READERS[(file_path, mtime_ns)] = reader
+    return reader
+
+
+def _load_waveform_chunk(
+    file_path: str,
+    mtime_ns: int,
+    clock: str,
+    signals: list[tuple[Any, str]],
+    kwargs: dict[str, Any],
+) -> tuple[str | None, list[tuple[Any, str, int | None, bool, list[Any]]]]:
+    """Load a chunk of signals in a worker process.
+
+    Numeric arrays are packed into one shared memory block whose name is returned
+    alongside per-array (offset, dtype, shape) descriptors; object arrays (signals
+    wider than 64 bits) cannot live in shared memory and are returned inline.
+    On Windows a block is freed once its last handle closes, before the parent
+    could attach, so all arrays are returned inline there.
+    """
+    reader = _get_worker_reader(file_path, mtime_ns)
+    waves = [
+        (key, reader.load_waveform(signal, clock, **kwargs)) for key, signal in signals
+    ]
+
+    total_size = 0
+    if sys.platform != "win32":
+        for _, wave in waves:
+            for array in (wave.value, wave.clock, wave.time):
+                if array.dtype != np.object_:
+                    total_size += array.nbytes
+
+    shm = SharedMemory(create=True, size=total_size) if total_size > 0 else None
+    entries: list[tuple[Any, str, int | None, bool, list[Any]]] = []
+    offset = 0
+    try:
+        for key, wave in waves:
+            arrays: list[Any] = []
+            for array in (wave.value, wave.clock, wave.time):
+                if shm is None or array.dtype == np.object_:
+                    arrays.append(array)
+                    continue
+                array = np.ascontiguousarray(array)
+                view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=offset)
+                view[...] = array
+                arrays.append((offset, array.dtype.str, array.shape))
+                offset += array.nbytes
+            entries.append((key, wave.signal.name, wave.width, wave.signed, arrays))
+    except Exception:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+        raise
+
+    if shm is None:
+        return None, entries
+    shm.close()
+    return shm.name, entries
+
+
+def _unpack_waveform_chunk(
+    shm_name: str | None,
+    entries: list[tuple[Any, str, int | None, bool, list[Any]]],
+) -> dict[Any, Waveform]:
+    shm = SharedMemory(name=shm_name) if shm_name is not None else None
+    try:
+        waves: dict[Any, Waveform] = {}
+        for key, name, width, signed, arrays in entries:
+            value, clock, time = (
+                np.ndarray(item[2], dtype=item[1], buffer=shm.buf, offset=item[0]).copy()
+                if isinstance(item, tuple) and shm is not None
+                else item
+                for item in arrays
+            )
+            waves[key] = Waveform(
+                value=value, clock=clock, time=time, signal=Signal(name, width, signed)
+            )
+        return waves
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
 
 
 class AnalysisEngine:
@@ -160,8 +455,68 @@ class AnalysisEngine:
         return self.reader.load_waveform(path, clock=clock, **kwargs)
 
     @log_exceptions
-    def load_matched_waveforms(self, pattern: Any, clock: str | None = None, **kwargs: Any) -> Any:
-        return self.reader.load_matched_waveforms(pattern, clock_pattern=clock, **kwargs)
+    def load_matched_waveforms(
+        self,
+        pattern: Any,
+        clock: str | None = None,
+        workers: int | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        workers = min(self.load_workers if workers is None else workers, MAX_LOAD_WORKERS)
+        if workers <= 1:
+            return self.reader.load_matched_waveforms(pattern, clock_pattern=clock, **kwargs)
+
+        clock_signals = self.reader.get_matched_signals(clock)
+        if not clock_signals:
+            raise Exception(f"clock pattern {clock} can not match any signal")
+        if len(clock_signals) > 1:
+            raise Exception(f"clock pattern {clock} match more than one signal: {clock_signals}")
+        clock_full_name = next(iter(clock_signals.values()))
+
+        matched_signals = list(self.reader.get_matched_signals(pattern).items())
+        workers = min(workers, len(matched_signals))
+        if workers <= 1:
+            return {
+                key: self.reader.load_waveform(signal, clock_full_name, **kwargs)
+                for key, signal in matched_signals
+            }
+
+        futures: list[Future[Any]] = []
+        errors: list[Exception] = []
+        try:
+            pool = get_load_pool()
+            futures = [
+                pool.submit(
+                    _load_waveform_chunk,
+                    self.file_path,
+                    self.file_mtime_ns,
+                    clock_full_name,
+                    matched_signals[i::workers],
+                    kwargs,
+                )
+                for i in range(workers)
+            ]
+        except BrokenProcessPool as e:
+            errors.append(e)
+        chunks: dict[Any, Waveform] = {}
+        # 即使某个 chunk 失败, 也要逐个取回结果以释放其余 chunk 的共享内存
+        for future in futures:
+            try:
+                chunks.update(_unpack_waveform_chunk(*future.result()))
+            except Exception as e:
+                errors.append(e)
+        if any(isinstance(e, BrokenProcessPool) for e in errors):
+            # worker 进程异常退出 (如 FSDB 原生库崩溃或被 OOM kill), 重建进程池并退回串行加载
+            print("Load pool broken, falling back to serial loading", file=sys.stderr)
+            reset_load_pool()
+            return {
+                key: self.reader.load_waveform(signal, clock_full_name, **kwargs)
+                for key, signal in matched_signals
+            }
+        if errors:
+            raise errors[0]
+        # 保持与 reader.load_matched_waveforms 相同的 key 顺序
+        return {key: chunks[key] for key, _ in matched_signals}
 
     def execute_transform(self, code: str) -> Any:
         aeval = Interpreter(
@@ -190,8 +545,10 @@ class AnalysisEngine:
             return cast(type[Any], FsdbReader)
         raise ValueError(f"Unsupported waveform file type: {suffix or 'unknown'}")
 
-    def __init__(self, file_path: str) -> None:
+    def __init__(self, file_path: str, load_workers: int = LOAD_WORKERS) -> None:
         self.file_path = file_path
+        self.file_mtime_ns = os.stat(file_path).st_mtime_ns
+        self.load_workers = load_workers
         self.reader_class = self.get_reader_class(file_path)
         self.reader = self.reader_class(file_path)
         self.reader.__enter__()
@@ -201,7 +558,7 @@ class AnalysisEngine:
             self.reader.__exit__(None, None, None)
             self.reader = None
 
-    def analyze_counter(self, transform_code: str, sample_rate: int = 1) -> CounterAnalysisResult:
+    def analyze_counter(self, transform_code: str, sample_rate: int = 1) -> CounterColumns:
         # CounterTransformResult = Waveform | dict[str, Waveform]
         data = self.execute_transform(transform_code)
         if isinstance(data, Waveform):
@@ -212,24 +569,22 @@ class AnalysisEngine:
         else:
             raise ValueError(f"Unexpected transform result type: {type(data)}")
 
-        series: dict[str, CounterSeries] = {}
+        series: dict[str, SeriesColumns] = {}
         for key, value in data.items():
             assert isinstance(value, Waveform), (
                 f"Unexpected value type for key {key}: {type(value)}"
             )
             sampled_wave = value.downsample(sample_rate, func=np.mean)
-            series[key] = {
-                "timestamps": sampled_wave.time.tolist(),
-                "values": sampled_wave.value.tolist(),
-            }
+            series[key] = SeriesColumns(timestamps=sampled_wave.time, values=sampled_wave.value)
 
-        return CounterAnalysisResult(
+        first_time = data[next(iter(data))].time
+        return CounterColumns(
             series=series,
-            time_range=[data[next(iter(data))].time[0], data[next(iter(data))].time[-1]],
+            time_range=np.array([first_time[0], first_time[-1]]),
             is_multiseries=is_multiseries,
         )
 
-    def analyze_instant(self, transform_code: str) -> InstantAnalysisResult:
+    def analyze_instant(self, transform_code: str) -> InstantColumns:
         # InstantTransformResult = Waveform | dict[str, Waveform]
         data = self.execute_transform(transform_code)
         if isinstance(data, Waveform):
@@ -240,23 +595,24 @@ class AnalysisEngine:
         else:
             raise ValueError(f"Unexpected transform result type: {type(data)}")
 
-        series: dict[str, InstantSeries] = {}
+        series: dict[str, SeriesColumns] = {}
         for key, value in data.items():
             assert isinstance(value, Waveform), (
                 f"Unexpected value type for key {key}: {type(value)}"
             )
             events = value.filter(lambda x: x != 0)
-            series[key] = InstantSeries(
-                timestamps=events.time.tolist(), values=events.map(lambda x: x-x).value.tolist()
+            series[key] = SeriesColumns(
+                timestamps=events.time, values=events.map(lambda x: x-x).value
             )
 
-        return InstantAnalysisResult(
+        first_time = data[next(iter(data))].time
+        return InstantColumns(
             series=series,
-            time_range=[data[next(iter(data))].time[0], data[next(iter(data))].time[-1]],
+            time_range=np.array([first_time[0], first_time[-1]]),
             is_multiseries=is_multiseries,
         )
 
-    def analyze_complete(self, transform_code: str) -> CompleteAnalysisResult:
+    def analyze_complete(self, transform_code: str) -> CompleteColumns:
         # CompleteTransformResult = Waveform | dict[str, Waveform]
         data = self.execute_transform(transform_code)
         if isinstance(data, Waveform):
@@ -267,20 +623,21 @@ class AnalysisEngine:
         else:
             raise ValueError(f"Unexpected transform result type: {type(data)}")
 
-        series: dict[str, CompleteSeries] = {}
+        series: dict[str, SeriesColumns] = {}
         for key, value in data.items():
             assert isinstance(value, Waveform), (
                 f"Unexpected value type for key {key}: {type(value)}"
             )
             events = value.filter(lambda x: x != 0)
-            series[key] = CompleteSeries(
-                timestamps=events.time.tolist(),
-                values=events.map(lambda x: x-x).value.tolist(),
-                durations=events.value.tolist(),
+            series[key] = SeriesColumns(
+                timestamps=events.time,
+                values=events.map(lambda x: x-x).value,
+                durations=events.value,
             )
 
-        return CompleteAnalysisResult(
+        first_time = data[next(iter(data))].time
+        return CompleteColumns(
             series=series,
-            time_range=[data[next(iter(data))].time[0], data[next(iter(data))].time[-1]],
+            time_range=np.array([first_time[0], first_time[-1]]),
             is_multiseries=is_multiseries,
         )
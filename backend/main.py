@@ -1,4 +1,5 @@
 import sys
+import multiprocessing
 import threading
 import socket
 import time
@@ -79,6 +80,8 @@ def start_web_server():
     uvicorn.run(app, host=host, port=port)
 
 if __name__ == "__main__":
+    # Required for the spawn-based signal loading pool in frozen builds
+    multiprocessing.freeze_support()
     # If packaged (frozen), default to desktop unless "server" arg is given
     if getattr(sys, 'frozen', False):
         if len(sys.argv) > 1 and sys.argv[1] == "server":